@@ -1,20 +1,73 @@
+import asyncio
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+import orjson
 import requests
-from bs4 import BeautifulSoup
-from tqdm import tqdm  # Import tqdm for progress bar
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from aiohttp_client_cache import CachedSession, SQLiteBackend
+import lxml.html
+from tqdm.asyncio import tqdm  # Import tqdm for progress bar
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Limit on concurrent review requests, to stay under Steam's per-IP rate limit
+MAX_CONCURRENT_REQUESTS = 8
+# Number of retries on 429 / 5xx responses before giving up
+MAX_RETRIES = 5
+
+# Seconds before a cached Steam response is fetched again
+CACHE_EXPIRE_AFTER = 3600
+
+# Shared session so the search requests reuse pooled connections and are cached
+# on disk between runs
+SESSION = requests_cache.CachedSession(
+    "steam_search_cache", expire_after=CACHE_EXPIRE_AFTER
+)
+# Keep enough keep-alive connections for every lookup thread, and retry rate
+# limits and server errors below the cache so failed attempts are never stored
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]
+        ),
+    ),
+)
+
+# Matches the opening tag of a search result row
+_RESULT_ROW_RE = re.compile(
+    rb'<[a-z]+\s[^>]*\bclass="(?:[^"]*\s)?search_result_row[\s"][^>]*>'
+)
+# Matches the app ID attribute inside a single tag
+_APPID_ATTR_RE = re.compile(rb'\sdata-ds-appid="([^"]*)"')
 
 
 # Function to get reviews for a given appid
-def get_reviews(appid, params={"json": 1}):
+async def get_reviews(session, semaphore, appid, params={"json": 1}):
     url = "https://store.steampowered.com/appreviews/"
-    response = requests.get(
-        url=url + appid, params=params, headers={"User-Agent": "Mozilla/5.0"}
-    )
-    return response.json()
+    for attempt in range(MAX_RETRIES + 1):
+        async with semaphore:
+            async with session.get(
+                url=url + appid, params=params, headers={"User-Agent": "Mozilla/5.0"}
+            ) as response:
+                # Retry with exponential backoff when rate-limited or on server errors
+                retryable = response.status == 429 or response.status >= 500
+                if not retryable or attempt == MAX_RETRIES:
+                    response.raise_for_status()
+                    return orjson.loads(await response.read())
+        # Sleep outside the semaphore so other requests can proceed meanwhile
+        await asyncio.sleep(2**attempt)
 
 
 # Function to get a specified number of reviews for a given appid
-def get_n_reviews(appid, n=300, language="english"):
+async def get_n_reviews(session, semaphore, appid, n=300, language="english"):
     reviews = []
     cursor = "*"
     params = {
@@ -26,12 +79,13 @@ def get_n_reviews(appid, n=300, language="english"):
         "purchase_type": "all",
     }
 
+    # Pages for one game are chained through the cursor, so they stay sequential
     while n > 0:
-        params["cursor"] = cursor.encode()
+        params["cursor"] = cursor
         params["num_per_page"] = min(100, n)
         n -= 100
 
-        response = get_reviews(appid, params)
+        response = await get_reviews(session, semaphore, appid, params)
         cursor = response["cursor"]
         reviews += response["reviews"]
 
@@ -41,30 +95,48 @@ def get_n_reviews(appid, n=300, language="english"):
     return reviews
 
 
-# Function to get the app ID for each game from Steam search results
-def get_app_id(game_names):
-    app_id = []
-    for title in game_names:
-        response = requests.get(
+# Look up the first Steam search result for a single game title. Returns whether a
+# result row was found, and the app ID on that row (if it has one)
+def _lookup(title):
+    try:
+        response = SESSION.get(
             url=f"https://store.steampowered.com/search/?term={title}&category1=998",
             headers={"User-Agent": "Mozilla/5.0"},
         )
-        soup = BeautifulSoup(response.text, "html.parser")
+    except requests.RequestException as e:
+        # e.g. retries exhausted on 429; don't let one title abort the others
+        print(f"Search request failed for {title}: {e}")
+        return title, None
 
-        # Try to find the search result row
-        game = soup.find(class_="search_result_row")
+    # Only the first row's attribute is needed, so skip building a full parse tree
+    row = _RESULT_ROW_RE.search(response.content)
+    if row:
+        app_id_match = _APPID_ATTR_RE.search(row.group())
+        if app_id_match:
+            return title, app_id_match.group(1).decode()
+        print(f"App ID not found for {title}")
+        return title, None
+
+    # Fall back to a real HTML parse in case the markup changed
+    rows = lxml.html.fromstring(response.content).xpath(
+        "(//*[contains(concat(' ', normalize-space(@class), ' '),"
+        " ' search_result_row ')])[1]"
+    )
+    if not rows:
+        print(f"No search result found for {title}")
+        return title, None
+    app_id = rows[0].get("data-ds-appid")
+    if not app_id:
+        print(f"App ID not found for {title}")
+    return title, app_id or None
 
-        if game:
-            # If a game is found, get the appid
-            app_id_value = game.get("data-ds-appid")
-            if app_id_value:
-                app_id.append(app_id_value)
-            else:
-                print(f"App ID not found for {title}")
-        else:
-            print(f"No search result found for {title}")
 
-    return app_id
+# Function to get the app ID for each game from Steam search results.
+# Returns (title, app_id) pairs in input order; app_id is None when the lookup failed
+def get_app_id(game_names):
+    # Search for all titles in parallel; map() keeps the input order
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(_lookup, game_names))
 
 
 # List of games to scrape
@@ -82,43 +154,110 @@ games = [
 # List of languages you want to scrape
 languages = ["english"]
 
-# Iterate through each language and scrape reviews
-for language in languages:
-    print(f"Scraping reviews for language: {language}")
-    reviews = []
-    game_list = get_app_id(games)
-
-    # Initialize progress bar for iterating over the games
-    for game, app_id in tqdm(
-        zip(games, game_list), total=len(games), desc="Scraping reviews"
-    ):
-        # Get reviews for the app ID and add the 'game' column
-        game_reviews = get_n_reviews(
-            app_id, 1000, language=language
-        )  # Use language parameter
-
-        # Add the 'game' column to each review
-        for review in game_reviews:
-            review["game"] = game  # Add the game name to each review
-
-        # Add the reviews to the main list
-        reviews += game_reviews
-
-    # Convert to DataFrame
-    df = pd.DataFrame(reviews)[
-        [
-            "timestamp_created",
-            "game",
-            "review",
-            "voted_up",
-            "weighted_vote_score",
-            "language",
+# Schema of the output Parquet file; 'author' keeps Steam's nested fields as a struct
+REVIEW_SCHEMA = pa.schema(
+    [
+        ("timestamp_created", pa.int64()),
+        ("game", pa.string()),
+        ("review", pa.string()),
+        ("voted_up", pa.bool_()),
+        ("weighted_vote_score", pa.float64()),
+        ("language", pa.string()),
+        (
             "author",
-        ]
+            pa.struct(
+                [
+                    ("steamid", pa.string()),
+                    ("num_games_owned", pa.int64()),
+                    ("num_reviews", pa.int64()),
+                    ("playtime_forever", pa.int64()),
+                    ("playtime_last_two_weeks", pa.int64()),
+                    ("playtime_at_review", pa.int64()),
+                    ("last_played", pa.int64()),
+                ]
+            ),
+        ),
     ]
+)
+
+# Columns written to the output files, in order
+COLUMNS = REVIEW_SCHEMA.names
+
+
+# Function to get one game's reviews and append them to the output files
+async def scrape_game(
+    session, semaphore, game, app_id, language, csv_file, parquet_writer
+):
+    game_reviews = await get_n_reviews(
+        session, semaphore, app_id, 1000, language=language
+    )
+    if not game_reviews:
+        return 0
+
+    # Add the 'game' column to the whole batch at once
+    df = pd.DataFrame(game_reviews).assign(game=game)[COLUMNS]
+    df.to_csv(csv_file, header=False, index=False)
+
+    # Each game becomes one row group in the Parquet file
+    df = df.assign(weighted_vote_score=pd.to_numeric(df["weighted_vote_score"]))
+    parquet_writer.write_table(
+        pa.Table.from_pandas(df, schema=REVIEW_SCHEMA, preserve_index=False)
+    )
+
+    # The batch is dropped on return, so only unfinished games stay in memory
+    return len(game_reviews)
+
+
+async def main():
+    # Iterate through each language and scrape reviews
+    for language in languages:
+        print(f"Scraping reviews for language: {language}")
+        # Games whose lookup failed are skipped; the rest keep their own app ID
+        game_list = [(game, app_id) for game, app_id in get_app_id(games) if app_id]
+        csv_path = f"data/GOTY_Steam_reviews_{language}_sample.csv"
+        parquet_path = f"data/GOTY_Steam_reviews_{language}_sample.parquet"
+
+        # One pooled session is shared by every game so connections are reused.
+        # Only successful responses are cached, so retried 429/5xx are never stored
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        connector = aiohttp.TCPConnector(limit=16)
+        cache = SQLiteBackend("steam_reviews_cache", expire_after=CACHE_EXPIRE_AFTER)
+        async with CachedSession(cache=cache, connector=connector) as session:
+            # Each game's reviews are written as soon as that game is done, in
+            # completion order. Parquet is the primary output; the CSV is kept for
+            # the notebooks that still read it
+            with (
+                open(csv_path, "w", newline="", encoding="utf-8") as f,
+                pq.ParquetWriter(
+                    parquet_path, REVIEW_SCHEMA, compression="zstd"
+                ) as parquet_writer,
+            ):
+                # Header goes through pandas too, so all lines share one terminator
+                pd.DataFrame(columns=COLUMNS).to_csv(f, index=False)
+
+                # Get reviews for all app IDs concurrently
+                counts = await tqdm.gather(
+                    *(
+                        scrape_game(
+                            session,
+                            semaphore,
+                            game,
+                            app_id,
+                            language,
+                            f,
+                            parquet_writer,
+                        )
+                        for game, app_id in game_list
+                    ),
+                    desc="Scraping reviews",
+                )
+        game_counts = Counter(dict(zip((game for game, _ in game_list), counts)))
+
+        print(f"Reviews for language {language} saved to {parquet_path} and {csv_path}")
+        for game, count in game_counts.most_common():
+            print(f"{game}: {count}")
+        print(f"Total reviews: {game_counts.total()}")
+
 
-    # Save the reviews for the current language to a CSV file
-    df.to_csv(f"data/GOTY_Steam_reviews_{language}_sample.csv", index=False)
-    print(f"Reviews for language {language} saved to GOTY_Steam_reviews_{language}.csv")
-    print(df["game"].value_counts())
-    print(df.shape)
+if __name__ == "__main__":
+    asyncio.run(main())
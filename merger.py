@@ -1,12 +1,28 @@
 import pandas as pd
+import numpy as np
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import re
+from functools import lru_cache
+
+# Extracts the number of days from strings like "3 days ago"
+_DAYS_RE = re.compile(r"(\d+)")
+
+# Matches dates in ISO format (e.g., "2024-11-21"), as written by the scraper
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# A list of possible date formats with a year
+_YEAR_FORMATS = [
+    "%d %b, %Y",  # e.g., '21 Nov, 2024'
+    "%B %d, %Y",  # e.g., 'May 29, 2024'
+    "%b %d, %Y",  # e.g., 'Dec 3, 2022'
+]
 
 
 def clean_date(date_str):
     """
     Converts a string from various Steam date formats to a standardized datetime object.
+    - Handles 'YYYY-MM-DD' (e.g., '2024-11-21', as written by the scraper).
     - Handles 'DD Mon, YYYY' (e.g., '21 Nov, 2024').
     - Handles 'Month DD, YYYY' (e.g., 'May 29, 2024').
     - Handles 'Mon DD, YYYY' (e.g., 'Dec 3, 2022').
@@ -32,38 +48,120 @@ def clean_date(date_str):
     if "days ago" in date_str_lower:
         try:
             # Use regex to find the number of days
-            days = int(re.search(r"\d+", date_str_lower).group())
+            days = int(_DAYS_RE.search(date_str_lower).group())
             return (now - timedelta(days=days)).date()
         except (ValueError, AttributeError):
             return pd.NaT  # If number extraction fails
 
-    # Case 2: Date includes a year (e.g., "21 Nov, 2024" or "May 29, 2024")
+    # Absolute dates repeat a lot, so they are parsed once per unique string
+    return _parse_absolute_date(date_str, now.date())
+
+
+@lru_cache(maxsize=None)
+def _parse_absolute_date(date_str, today):
+    """
+    Parses an absolute Steam date string. Kept separate from clean_date so that the
+    result only depends on its arguments and can be cached.
+
+    Args:
+        date_str (str): The date string to convert.
+        today (date): The reference date used to fill in a missing year.
+
+    Returns:
+        date or pd.NaT: A date object or NaT (Not a Time) if conversion fails.
+    """
+    # Case 2: Date is already in ISO format (e.g., "2024-11-21")
+    if _ISO_DATE_RE.fullmatch(date_str):
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            return pd.NaT  # e.g., '2024-13-45'
+
+    # Case 3: Date includes a year (e.g., "21 Nov, 2024" or "May 29, 2024")
     if "," in date_str:
-        # A list of possible date formats with a year
-        formats_to_try = [
-            "%d %b, %Y",  # e.g., '21 Nov, 2024'
-            "%B %d, %Y",  # e.g., 'May 29, 2024'
-            "%b %d, %Y",  # e.g., 'Dec 3, 2022'
-        ]
-        for fmt in formats_to_try:
+        for fmt in _YEAR_FORMATS:
             try:
-                return pd.to_datetime(date_str, format=fmt).date()
+                return datetime.strptime(date_str, fmt).date()
             except ValueError:
                 continue  # Try the next format if this one fails
 
-    # Case 3: Date does not include a year (e.g., "16 Jan")
+    # Case 4: Date does not include a year (e.g., "16 Jan")
     try:
         # Append the current year and parse
-        date_with_year = f"{date_str} {now.year}"
-        dt = pd.to_datetime(date_with_year, format="%d %b %Y")
+        date_with_year = f"{date_str} {today.year}"
+        dt = datetime.strptime(date_with_year, "%d %b %Y").date()
         # If the parsed date is in the future, it likely belongs to the previous year
-        if dt > now:
-            dt = dt.replace(year=now.year - 1)
-        return dt.date()
+        if dt > today:
+            dt = dt.replace(year=today.year - 1)
+        return dt
     except ValueError:
         return pd.NaT  # Return NaT if all formats fail
 
 
+def clean_dates(date_series):
+    """
+    Vectorized version of clean_date for a whole column of Steam date strings.
+    Relative dates and absolute dates (with or without a year) are parsed in bulk
+    by pandas; any row that still fails is retried with clean_date.
+
+    Args:
+        date_series (pd.Series): The column of date strings to convert.
+
+    Returns:
+        pd.Series: A datetime64 Series, with NaT where conversion fails.
+    """
+    s = date_series.astype("string").str.lower()
+    now = pd.Timestamp.now()
+    today = now.normalize()
+
+    # Case 2: Dates already in ISO format (e.g., "2024-11-21") take the fast path
+    is_iso = s.str.fullmatch(_ISO_DATE_RE, na=False)
+
+    # Split the remaining rows by the kind of date they hold
+    is_yesterday = s.str.contains("yesterday", na=False)
+    is_days_ago = s.str.contains("days ago", na=False)
+    is_absolute = s.notna() & ~(is_iso | is_yesterday | is_days_ago)
+    has_year = is_absolute & s.str.contains(",", regex=False, na=False)
+    no_year = is_absolute & ~has_year
+
+    # Microsecond resolution covers any 4-digit year, unlike nanoseconds (1677-2262),
+    # so an odd year can't make the assignments below overflow
+    cleaned = pd.Series(pd.NaT, index=s.index, dtype="datetime64[us]")
+    cleaned[is_iso] = pd.to_datetime(
+        s[is_iso], format="%Y-%m-%d", exact=True, errors="coerce"
+    )
+
+    # Case 1: Relative dates like "Yesterday" or "X days ago"
+    cleaned[is_yesterday] = today - pd.Timedelta(days=1)
+    days = pd.to_numeric(
+        s[is_days_ago].str.extract(_DAYS_RE, expand=False), errors="coerce"
+    )
+    cleaned[is_days_ago] = today - pd.to_timedelta(days, unit="D")
+
+    # Case 3: Date includes a year (e.g., "21 Nov, 2024" or "May 29, 2024")
+    # Try the same explicit formats as clean_date, keeping the first one that fits
+    first_format, *other_formats = _YEAR_FORMATS
+    dt = pd.to_datetime(s[has_year], format=first_format, exact=True, errors="coerce")
+    for fmt in other_formats:
+        dt = dt.combine_first(
+            pd.to_datetime(s[has_year], format=fmt, exact=True, errors="coerce")
+        )
+    cleaned[has_year] = dt
+
+    # Case 4: Date does not include a year (e.g., "16 Jan"), assume the current one
+    dt = pd.to_datetime(s[no_year] + f" {now.year}", format="%d %b %Y", errors="coerce")
+    # If the parsed date is in the future, it likely belongs to the previous year
+    dt = dt.where(dt <= now, dt - pd.DateOffset(years=1))
+    cleaned[no_year] = dt
+
+    # Slow path: retry anything pandas could not parse with the scalar parser
+    failed = cleaned.isna() & date_series.notna()
+    if failed.any():
+        cleaned[failed] = date_series[failed].apply(clean_date).astype("datetime64[us]")
+
+    return cleaned
+
+
 def extract_topic(row):
     """
     Analyzes the title and description of an announcement to determine its topic.
@@ -96,14 +194,50 @@ def extract_topic(row):
     return "Other"  # Default category if no keywords are found
 
 
-def add_game_titles_and_topics(input_csv_path, output_csv_path):
+def extract_topics(df):
+    """
+    Vectorized version of extract_topic for a whole DataFrame of announcements.
+    Uses the same keywords and priority order, but runs pandas string operations
+    over full columns instead of a Python function per row.
+
+    Args:
+        df (pd.DataFrame): A DataFrame that must contain 'title' and 'desc' columns.
+
+    Returns:
+        np.ndarray: The extracted topic for each row.
+    """
+    title = df["title"].astype("string").str.lower()
+    desc = df["desc"].astype("string").str.lower()
+
+    # Combine title and description for a more comprehensive search
+    full_text = title.str.cat(desc, sep=" ", na_rep="")
+
+    def contains(text, keyword):
+        return text.str.contains(keyword, regex=False, na=False)
+
+    # Conditions are listed in priority order; np.select picks the first match
+    conditions = [
+        contains(full_text, "dlc"),
+        contains(title, "hotfix") | contains(title, "hot fix"),  # Title only
+        contains(full_text, "patch"),
+        contains(full_text, "update"),
+        contains(full_text, "fix"),
+    ]
+    topics = ["DLC", "Hotfix", "Patch", "Update", "Fix"]
+
+    return np.select(conditions, topics, default="Other")
+
+
+def add_game_titles_and_topics(input_csv_path, output_path):
     """
     Reads a CSV file of scraped Steam announcements, adds a 'game_title' and 'topic'
-    column, cleans the date column, and saves the result to a new CSV file.
+    column, cleans the date column, and saves the result to a new Parquet or CSV file.
 
     Args:
         input_csv_path (str): The path to the input CSV file from the scraper.
-        output_csv_path (str): The path where the new CSV file will be saved.
+        output_path (str): The path where the new file will be saved. Paths ending in
+            '.parquet' are written as Parquet, with a CSV copy next to them for the
+            notebooks; anything else is written as CSV only.
     """
     # --- Step 1: Define the mapping from game_id to game_title ---
     id_to_title_map = {
@@ -129,33 +263,37 @@ def add_game_titles_and_topics(input_csv_path, output_csv_path):
     # --- Step 3: Create new cleaned_date column, keeping the original ---
     print("Cleaning and standardizing dates...")
     # Rename original 'date' column to 'original_date' for comparison
-    df.rename(columns={"date": "original_date"}, inplace=True)
-    # Create the new 'cleaned_date' column by applying the function
-    df["cleaned_date"] = df["original_date"].apply(clean_date)
-    print("Created 'cleaned_date' column.")
+    df = df.rename(columns={"date": "original_date"})
+    # Build the new 'cleaned_date' column with the vectorized parser
+    cleaned_date = clean_dates(df["original_date"])
 
-    # --- Step 4: Add the 'game_title' column ---
-    df["game_id"] = df["game_id"].astype(str)
+    # --- Step 4: Build the 'game_title' column ---
+    game_id = df["game_id"].astype(str)
 
     # --- Check for unknown game IDs and warn the user ---
-    known_ids = set(id_to_title_map.keys())
-    all_ids_in_csv = set(df["game_id"].unique())
-    unknown_ids = all_ids_in_csv - known_ids
+    known_mask = game_id.isin(pd.Index(id_to_title_map.keys()))
+    unknown_ids = game_id[~known_mask].drop_duplicates().sort_values()
 
-    if unknown_ids:
+    if not unknown_ids.empty:
         print("\n--- WARNING: Unknown Game IDs Found ---")
         print("The following game IDs from your CSV were not found in the title map:")
-        for uid in sorted(list(unknown_ids)):
+        for uid in unknown_ids:
             print(f"  - {uid}")
         print("These games will have 'Unknown Game' as their title.")
         print("-------------------------------------\n")
 
-    df["game_title"] = df["game_id"].map(id_to_title_map)
-    df["game_title"].fillna("Unknown Game", inplace=True)  # Fill missing titles
-    print("Successfully added the 'game_title' column.")
+    # Fill missing titles, reusing the membership mask from the check above
+    game_title = np.where(known_mask, game_id.map(id_to_title_map), "Unknown Game")
+
+    # --- Step 5: Build the 'topic' column ---
+    topic = extract_topics(df)
 
-    # --- Step 5: Add the 'topic' column ---
-    df["topic"] = df.apply(extract_topic, axis=1)
+    # Add all new columns in one go instead of growing the DataFrame column by column
+    df = df.assign(
+        game_id=game_id, cleaned_date=cleaned_date, game_title=game_title, topic=topic
+    )
+    print("Created 'cleaned_date' column.")
+    print("Successfully added the 'game_title' column.")
     print("Successfully added the 'topic' column.")
 
     # --- Step 6: Reorder columns for better readability ---
@@ -180,14 +318,24 @@ def add_game_titles_and_topics(input_csv_path, output_csv_path):
         print("No missing values found in the final dataset.")
     print("-----------------------------\n")
 
-    # --- Step 8: Save the new DataFrame to a new CSV file ---
+    # --- Step 8: Save the new DataFrame to a new Parquet or CSV file ---
     try:
-        df.to_csv(output_csv_path, index=False, encoding="utf-8")
-        print(f"Successfully saved the updated data to '{output_csv_path}'")
+        if output_path.endswith(".parquet"):
+            # Parquet keeps the column types, so readers don't re-parse the dates
+            df.to_parquet(
+                output_path, index=False, engine="pyarrow", compression="zstd"
+            )
+            print(f"Successfully saved the updated data to '{output_path}'")
+            # Keep a CSV copy for the notebooks that still read CSV
+            csv_path = os.path.splitext(output_path)[0] + ".csv"
+        else:
+            csv_path = output_path
+        df.to_csv(csv_path, index=False, encoding="utf-8")
+        print(f"Successfully saved the updated data to '{csv_path}'")
         print("\n--- First 5 rows of the new data ---")
         print(df.head())
     except Exception as e:
-        print(f"An error occurred while saving the new CSV file: {e}")
+        print(f"An error occurred while saving the new file: {e}")
 
 
 if __name__ == "__main__":
@@ -195,7 +343,7 @@ if __name__ == "__main__":
     input_file = "steam_announcements.csv"
 
     # The name for the new file with the added titles and topics
-    output_file = "steam_announcements_with_titles.csv"
+    output_file = "steam_announcements_with_titles.parquet"
 
     # Run the function to process the data
     add_game_titles_and_topics(input_file, output_file)
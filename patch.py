@@ -1,75 +1,112 @@
-import time
+import asyncio
+import re
+from datetime import datetime, timezone
+from aiohttp_client_cache import CachedSession, SQLiteBackend
+import orjson
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-import shutil  # Used as a fallback for checking the PATH
-import os  # Used to check for files and expand user paths
 
-
-def setup_driver():
-    """
-    Sets up a local Selenium Chrome WebDriver for a Windows environment.
-    It checks common installation paths to be more reliable.
+STEAM_EVENTS_URL = "https://store.steampowered.com/events/ajaxgetpartnereventspageable/"
+# Number of events requested per page from the events endpoint
+EVENTS_PER_PAGE = 100
+# Seconds before a cached events page is fetched again
+CACHE_EXPIRE_AFTER = 3600
+# Matches [img]...[/img] blocks, which only hold an image URL, in announcement bodies
+_BBCODE_IMG_RE = re.compile(
+    r"\[img(?:[ =][^\]]*)?\].*?\[/img\]", re.IGNORECASE | re.DOTALL
+)
+# Known BBCode tags, keeping their content. Block-level tags (e.g., [/h2] or [*])
+# mark a line break, table cells a space, and inline tags (e.g., [b] or [url=...])
+# nothing. Other bracketed text (e.g., "[PC]" or "[Patch Notes]") is left alone
+_BBCODE_BLOCK_RE = re.compile(
+    r"\[/?(?:h[1-6]|p|list|olist|\*|hr|table|tr|quote|code)(?:[ =][^\]]*)?\]",
+    re.IGNORECASE,
+)
+_BBCODE_CELL_RE = re.compile(r"(?:\[/?(?:td|th)(?:[ =][^\]]*)?\])+", re.IGNORECASE)
+_BBCODE_INLINE_RE = re.compile(
+    r"\[/?(?:b|i|u|s|strike|url|spoiler|noparse|img|previewyoutube|video"
+    r"|dynamiclink)(?:[ =][^\]]*)?\]",
+    re.IGNORECASE,
+)
+_BLANK_LINES_RE = re.compile(r"[ \t]*\n\s*")
+
+
+async def fetch_announcements(session, app_id):
     """
-    # --- Check for Chrome in common Windows locations ---
-    chrome_path = None
-    # List of common installation paths for Chrome on Windows
-    possible_paths = [
-        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-        os.path.expanduser(r"~\AppData\Local\Google\Chrome\Application\chrome.exe"),
-    ]
+    Fetches all announcement events of a single app_id from Steam's JSON events
+    endpoint, following the offset until the last page.
+
+    Args:
+        session: The aiohttp.ClientSession used for the requests.
+        app_id: A Steam application ID (as a string).
 
-    print("Searching for Google Chrome installation...")
-    for path in possible_paths:
-        if os.path.exists(path):
-            chrome_path = path
-            print(f"Found Chrome at: {path}")
+    Returns:
+        A list of event dicts as returned by Steam.
+    """
+    events = []
+    offset = 0
+    while True:
+        params = {
+            "clan_accountid": 0,
+            "appid": app_id,
+            "offset": offset,
+            "count": EVENTS_PER_PAGE,
+        }
+        async with session.get(
+            STEAM_EVENTS_URL, params=params, headers={"User-Agent": "Mozilla/5.0"}
+        ) as response:
+            response.raise_for_status()
+            page = orjson.loads(await response.read()).get("events", [])
+
+        events += page
+        if len(page) < EVENTS_PER_PAGE:
             break
+        offset += EVENTS_PER_PAGE
 
-    # Fallback to shutil.which if not found in common locations
-    if not chrome_path:
-        print("Chrome not found in common locations, checking system PATH...")
-        chrome_path = shutil.which("chrome")
-
-    if not chrome_path:
-        print("---")
-        print("ERROR: Google Chrome browser not found.")
-        print("Please install Google Chrome on your system to run this scraper.")
-        print("You can download it from: https://www.google.com/chrome/")
-        print("---")
-        return None  # Return None to indicate that setup failed
-
-    options = webdriver.ChromeOptions()
-    # options.add_argument('--headless')  # Run in headless mode (no browser window)
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    )
+    return events
 
-    print("Setting up WebDriver...")
-    # Automatically download and manage the correct ChromeDriver for your installed Chrome version
-    try:
-        driver = webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager().install()), options=options
-        )
-        print("WebDriver setup complete.")
-        return driver
-    except Exception as e:
-        print(f"ERROR: Failed to setup WebDriver. {e}")
-        print("This might be a permission issue or a problem with webdriver-manager.")
-        return None
 
+def parse_announcement(app_id, event):
+    """
+    Extracts the date, title and description of a single Steam event.
 
-def scrape_steam_announcements(app_ids):
+    Args:
+        app_id: The Steam application ID the event belongs to.
+        event: An event dict from the events endpoint.
+
+    Returns:
+        A dict with the 'game_id', 'date', 'title' and 'desc' of the announcement.
+    """
+    body = event.get("announcement_body") or {}
+
+    # posttime is a unix timestamp, so no date string parsing is needed
+    posttime = body.get("posttime")
+    date = (
+        datetime.fromtimestamp(posttime, tz=timezone.utc).date().isoformat()
+        if posttime
+        else "N/A"
+    )
+    title = body.get("headline") or event.get("event_name") or "N/A"
+    description = _BBCODE_IMG_RE.sub("", body.get("body") or "")
+    # Headings, paragraphs and list items become separate lines, and table cells are
+    # spaced out, so neighbouring blocks don't run together
+    description = _BBCODE_BLOCK_RE.sub("\n", description)
+    description = _BBCODE_CELL_RE.sub(" ", description)
+    description = _BBCODE_INLINE_RE.sub("", description)
+    description = _BLANK_LINES_RE.sub("\n", description)
+    description = description.strip() or "N/A"
+
+    return {
+        "game_id": app_id,
+        "date": date,
+        "title": title,
+        "desc": description,
+    }
+
+
+async def scrape_steam_announcements(app_ids):
     """
-    Scrapes Steam announcements for a list of app_ids by scrolling the page,
-    and saves the data to a CSV file.
+    Fetches Steam announcements for a list of app_ids concurrently and collects
+    the data into a DataFrame.
 
     Args:
         app_ids: A list of Steam application IDs (as strings).
@@ -77,103 +114,25 @@ def scrape_steam_announcements(app_ids):
     Returns:
         A pandas DataFrame containing the scraped data.
     """
-    base_url = "https://steamcommunity.com/app/{}}/allnews/"
     all_announcements_data = []
-    driver = setup_driver()
-
-    # --- Check if driver setup was successful ---
-    if not driver:
-        print("WebDriver setup failed. Aborting the scraping process.")
-        return pd.DataFrame()  # Return an empty DataFrame
-
-    for app_id in app_ids:
-        print(f"Scraping announcements for app_id: {app_id}")
-        url = base_url.format(app_id)
-
-        try:
-            driver.get(url)
-
-            # --- Handle Age Verification Gate ---
-            try:
-                # Wait for the page to load and potentially show the age gate
-                time.sleep(2)
-                # Updated locator using the CSS classes you provided.
-                # This looks for an element with both 'btn_blue_steamui' and 'btn_medium' classes.
-                age_gate_button = driver.find_element(
-                    By.CSS_SELECTOR, ".btn_blue_steamui.btn_medium"
-                )
-                print(
-                    f"Age verification page found for app_id {app_id}. Clicking button."
-                )
-                age_gate_button.click()
-                # Wait for the actual content page to load
-                time.sleep(3)
-            except NoSuchElementException:
-                # If the button isn't found, it means there was no age gate.
-                print(
-                    f"No age verification page for app_id {app_id}, proceeding directly."
-                )
-                pass
-
-            # --- Scrolling Logic ---
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            scroll_attempts = 0
-            max_scroll_attempts = 5  # Prevents infinite loops on static pages
-
-            while scroll_attempts < max_scroll_attempts:
-                # Scroll down to the bottom of the page
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-
-                # Wait for new content to load
-                time.sleep(3)
-
-                # Calculate new scroll height and compare with last scroll height
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    # If height hasn't changed, we've likely reached the bottom
-                    print("Reached the end of the page.")
-                    break
-                last_height = new_height
-                scroll_attempts += 1
-
-            # --- Parsing Logic ---
-            # Get the full page source after scrolling
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-
-            # Find all announcement cards
-            announcement_cards = soup.find_all("div", class_="apphub_Card")
-            print(
-                f"Found {len(announcement_cards)} announcement cards for app_id: {app_id} after scrolling."
-            )
-
-            for card in announcement_cards:
-                date_elem = card.find("div", class_="apphub_CardContentNewsDate")
-                title_elem = card.find("div", class_="apphub_CardHeaderContent")
-                desc_elem = card.find("div", class_="apphub_CardContentNewsDesc")
-
-                date = date_elem.get_text(strip=True) if date_elem else "N/A"
-                title = (
-                    title_elem.a.get_text(strip=True)
-                    if title_elem and title_elem.a
-                    else "N/A"
-                )
-                description = desc_elem.get_text(strip=True) if desc_elem else "N/A"
-
-                all_announcements_data.append(
-                    {
-                        "game_id": app_id,
-                        "date": date,
-                        "title": title,
-                        "desc": description,
-                    }
-                )
-
-        except Exception as e:
-            print(f"An error occurred while processing app_id {app_id}: {e}")
-
-    # Close the browser once all app_ids are processed
-    print("Closing WebDriver.")
-    driver.quit()
+
+    # Responses are cached on disk, so re-runs don't hit Steam again
+    cache = SQLiteBackend("steam_events_cache", expire_after=CACHE_EXPIRE_AFTER)
+    async with CachedSession(cache=cache) as session:
+        results = await asyncio.gather(
+            *(fetch_announcements(session, app_id) for app_id in app_ids),
+            return_exceptions=True,
+        )
+
+    for app_id, events in zip(app_ids, results):
+        if isinstance(events, Exception):
+            print(f"An error occurred while processing app_id {app_id}: {events}")
+            continue
+
+        print(f"Found {len(events)} announcements for app_id: {app_id}")
+        all_announcements_data += [
+            parse_announcement(app_id, event) for event in events
+        ]
 
     df = pd.DataFrame(all_announcements_data)
     return df
@@ -181,9 +140,9 @@ def scrape_steam_announcements(app_ids):
 
 if __name__ == "__main__":
     # Instructions for Windows:
-    # 1. Make sure you have Python and Google Chrome installed.
+    # 1. Make sure you have Python installed.
     # 2. Open a Command Prompt or PowerShell.
-    # 3. Install the required libraries: pip install pandas beautifulsoup4 selenium webdriver-manager
+    # 3. Install the required libraries: pip install pandas aiohttp aiohttp-client-cache orjson
     # 4. Run this script: python your_script_name.py
     game_ids = [
         "1222690",  # Dragon Age Inquisition
@@ -196,7 +155,7 @@ if __name__ == "__main__":
         "1086940",  # Baldur's Gate 3
     ]
 
-    announcement_df = scrape_steam_announcements(game_ids)
+    announcement_df = asyncio.run(scrape_steam_announcements(game_ids))
 
     if not announcement_df.empty:
         csv_filename = "steam_announcements.csv"